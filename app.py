@@ -1,5 +1,7 @@
 # app.py
 import random
+from collections import deque
+
 import streamlit as st
 
 # -----------------------------
@@ -45,6 +47,23 @@ CSS = f"""
         color: #FFFFFF !important;
         box-shadow: none !important;
     }}
+    .stButton > button:disabled {{
+        opacity: 1 !important;
+        cursor: default !important;
+    }}
+    /* Static board shown once the round is over */
+    .board {{
+        display:grid; grid-template-columns:repeat(3, 1fr); gap:12px; padding: 6px 8px;
+    }}
+    .tile {{
+        height:110px; border-radius:14px; background:{GRID_BG};
+        border:2px solid rgba(255,255,255,0.08);
+        display:flex; align-items:center; justify-content:center;
+        font-size:44px; font-weight:800;
+    }}
+    .tile.win {{
+        border-color:{ACCENT}; background:rgba(108,140,255,0.18);
+    }}
     /* Make grid spacing nice */
     div[data-testid="column"] {{
         padding: 6px 8px !important;
@@ -67,11 +86,26 @@ WIN_LINES = [
     (0,4,8), (2,4,6)                   # diagonals
 ]
 
-def check_winner(board):
-    for a,b,c in WIN_LINES:
+# Bit i of a mask is cell i, so a player owns a line when (bits & mask) == mask
+WIN_MASKS = tuple(sum(1 << i for i in line) for line in WIN_LINES)
+FULL_MASK = 0x1FF
+
+def to_bits(board, mark):
+    return sum(1 << i for i, v in enumerate(board) if v == mark)
+
+def find_winner(board):
+    # Winner and the line they completed, in a single pass over the lines
+    for line in WIN_LINES:
+        a, b, c = line
         if board[a] and board[a] == board[b] == board[c]:
-            return board[a]  # "X" or "O"
-    return None
+            return board[a], line
+    return None, None
+
+def check_winner(board):
+    return find_winner(board)[0]  # "X", "O" or None
+
+def winning_line(board):
+    return find_winner(board)[1]
 
 def is_board_full(board):
     return all(cell != "" for cell in board)
@@ -82,59 +116,227 @@ def available_moves(board):
 def display_char(mark):
     return "❌" if mark == "X" else ("⭕" if mark == "O" else " ")
 
+def board_html(board):
+    line = winning_line(board) or ()
+    tiles = "".join(
+        f'<div class="tile{" win" if i in line else ""}">{display_char(mark)}</div>'
+        for i, mark in enumerate(board)
+    )
+    return f'<div class="board">{tiles}</div>'
+
 # -----------------------------
 # Minimax for Hard AI
 # -----------------------------
-def minimax(board, ai_mark, human_mark, is_maximizing):
-    winner = check_winner(board)
-    if winner == ai_mark:
-        return 10
-    if winner == human_mark:
-        return -10
-    if is_board_full(board):
+# The search runs on bitboards: one 9-bit int per player, bit i set when
+# that player owns cell i. The UI keeps the list-of-strings board and only
+# converts when asking the AI for a move.
+def has_line(bits):
+    for m in WIN_MASKS:
+        if bits & m == m:
+            return True
+    return False
+
+# Center, then corners, then edges: strong moves first gives alpha-beta
+# its early cut-offs.
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+def iter_moves(occupied):
+    for m in MOVE_ORDER:
+        if not occupied >> m & 1:
+            yield m
+
+class MoveStack:
+    """Empty cells of the position being searched, kept in place across the
+    whole search. Playing the move in slot i swaps it past the live region;
+    undoing it swaps it back, so no per-node move list is allocated."""
+
+    __slots__ = ("empties", "size")
+
+    def __init__(self, occupied):
+        self.empties = [m for m in MOVE_ORDER if not occupied >> m & 1]
+        self.size = len(self.empties)
+
+    def push(self, i):
+        empties = self.empties
+        last = self.size - 1
+        m = empties[i]
+        empties[i], empties[last] = empties[last], m
+        self.size = last
+        return m
+
+    def pop(self, i):
+        empties = self.empties
+        last = self.size
+        empties[i], empties[last] = empties[last], empties[i]
+        self.size = last + 1
+
+# The 8 symmetries of the square (rotations and reflections) as cell maps:
+# cell i of the transformed board is cell p[i] of the original.
+SYMMETRIES = (
+    (0,1,2,3,4,5,6,7,8), (6,3,0,7,4,1,8,5,2),   # identity, rotate 90
+    (8,7,6,5,4,3,2,1,0), (2,5,8,1,4,7,0,3,6),   # rotate 180, rotate 270
+    (2,1,0,5,4,3,8,7,6), (6,7,8,3,4,5,0,1,2),   # mirror left/right, top/bottom
+    (0,3,6,1,4,7,2,5,8), (8,5,2,7,4,1,6,3,0),   # mirror on both diagonals
+)
+
+@st.cache_resource
+def symmetry_tables():
+    # tables[k][bits] is bits with SYMMETRIES[k] applied; built once per process
+    return tuple(
+        tuple(sum(1 << i for i in range(9) if bits >> p[i] & 1) for bits in range(512))
+        for p in SYMMETRIES
+    )
+
+SYMMETRY_TABLES = symmetry_tables()
+
+def canonical(ai, human):
+    # Smallest image of the position under the 8 symmetries; equivalent
+    # positions share one key.
+    return min((t[ai], t[human]) for t in SYMMETRY_TABLES)
+
+# Transposition table flags: the stored score is exact, or only a bound
+# because the search that produced it was cut off by alpha-beta.
+EXACT, LOWERBOUND, UPPERBOUND = 0, 1, 2
+
+@st.cache_resource
+def transposition_table():
+    # canonical (side to move, opponent) bits -> (score, flag); shared across reruns
+    return {}
+
+TT = transposition_table()
+
+def negamax(me, opp, depth, alpha=-10**9, beta=10**9, moves=None):
+    # Score from the point of view of the side to move (`me`). Only the
+    # player who just moved can have completed a line. `depth` is the number
+    # of marks on the board, so quicker wins score higher (10 - depth) and
+    # the value still depends on the position alone, which keeps TT entries
+    # valid across searches.
+    if has_line(opp):
+        return depth - 10
+    occupied = me | opp
+    if occupied == FULL_MASK:
         return 0
 
-    moves = available_moves(board)
-    if is_maximizing:
-        best = -999
-        for m in moves:
-            board[m] = ai_mark
-            score = minimax(board, ai_mark, human_mark, False)
-            board[m] = ""
-            best = max(best, score)
-        return best
+    key = canonical(me, opp)
+    entry = TT.get(key)
+    if entry is not None:
+        score, flag = entry
+        if flag == EXACT:
+            return score
+        if flag == LOWERBOUND:
+            alpha = max(alpha, score)
+        else:
+            beta = min(beta, score)
+        if alpha >= beta:
+            return score
+    alpha_orig = alpha
+
+    if moves is None:
+        moves = MoveStack(occupied)
+    best = -999
+    for i in range(moves.size):
+        m = moves.push(i)
+        score = -negamax(opp, me | 1 << m, depth + 1, -beta, -alpha, moves)
+        moves.pop(i)
+        best = max(best, score)
+        alpha = max(alpha, best)
+        if alpha >= beta:
+            break  # cut-off
+
+    if best <= alpha_orig:
+        TT[key] = (best, UPPERBOUND)
+    elif best >= beta:
+        TT[key] = (best, LOWERBOUND)
     else:
-        best = 999
-        for m in moves:
-            board[m] = human_mark
-            score = minimax(board, ai_mark, human_mark, True)
-            board[m] = ""
-            best = min(best, score)
-        return best
+        TT[key] = (best, EXACT)
+    return best
 
 def best_move_minimax(board, ai_mark):
+    # Opening book: the first reply is known, skip the largest searches
+    empties = board.count("")
+    if empties == 9:
+        return 4  # center
+    if empties == 8 and board[4] != "":
+        return 0  # corner against a center opening
+
     human_mark = "O" if ai_mark == "X" else "X"
+    ai, human = to_bits(board, ai_mark), to_bits(board, human_mark)
+    depth = 9 - empties + 1  # marks on the board after our move
     best_score = -999
     move_best = None
-    for m in available_moves(board):
-        board[m] = ai_mark
-        score = minimax(board, ai_mark, human_mark, False)
-        board[m] = ""
+    seen = set()
+    for m in iter_moves(ai | human):
+        # Symmetric moves score the same: on an empty board only a corner,
+        # an edge and the center are searched.
+        child = canonical(ai | 1 << m, human)
+        if child in seen:
+            continue
+        seen.add(child)
+        score = -negamax(human, ai | 1 << m, depth, -10**9, 10**9)
         if score > best_score:
             best_score = score
             move_best = m
     return move_best
 
+@st.cache_resource
+def build_policy():
+    # Tic-tac-toe is small enough to solve outright: walk every reachable
+    # position once (BFS from the empty board) and remember the minimax move
+    # for the side to move. Hard AI then answers with a dict lookup.
+    policy = {}
+    start = ("",) * 9
+    seen = {(start, "X")}
+    queue = deque(seen)
+    while queue:
+        state, to_move = queue.popleft()
+        # The solver only reads the board, so the tuple is used as is
+        if check_winner(state) or is_board_full(state):
+            continue
+        policy[(state, to_move)] = best_move_minimax(state, to_move)
+        nxt = "O" if to_move == "X" else "X"
+        for m in available_moves(state):
+            child = state[:m] + (to_move,) + state[m + 1:]
+            if (child, nxt) not in seen:
+                seen.add((child, nxt))
+                queue.append((child, nxt))
+    return policy
+
+POLICY = build_policy()
+
+def best_move_hard(board, ai_mark):
+    move = POLICY.get((tuple(board), ai_mark))
+    if move is None:
+        move = best_move_minimax(board, ai_mark)
+    return move
+
 # -----------------------------
 # Normal AI (rule-based)
 # -----------------------------
+CORNERS = (0, 2, 6, 8)
+SIDES = (1, 3, 5, 7)
+
+def random_empty(board, cells):
+    # Uniform pick among the empty cells without building a list of them
+    count = 0
+    for i in cells:
+        if board[i] == "":
+            count += 1
+    if not count:
+        return None
+    k = random.randrange(count)
+    for i in cells:
+        if board[i] == "":
+            if k == 0:
+                return i
+            k -= 1
+
 def find_winning_move(board, mark):
+    # Test each empty cell on the player's bitboard; the board itself is
+    # only read, never played on
+    own = to_bits(board, mark)
     for m in available_moves(board):
-        board[m] = mark
-        if check_winner(board) == mark:
-            board[m] = ""
+        if has_line(own | 1 << m):
             return m
-        board[m] = ""
     return None
 
 def best_move_normal(board, ai_mark):
@@ -152,25 +354,21 @@ def best_move_normal(board, ai_mark):
     if board[4] == "":
         return 4
     # 4) Corners
-    corners = [i for i in [0,2,6,8] if board[i] == ""]
-    if corners:
-        return random.choice(corners)
+    m = random_empty(board, CORNERS)
+    if m is not None:
+        return m
     # 5) Sides
-    sides = [i for i in [1,3,5,7] if board[i] == ""]
-    if sides:
-        return random.choice(sides)
-    return None
+    return random_empty(board, SIDES)
 
 # -----------------------------
 # Easy AI (random)
 # -----------------------------
 def best_move_easy(board, ai_mark):
-    moves = available_moves(board)
-    return random.choice(moves) if moves else None
+    return random_empty(board, range(9))
 
 def get_ai_move(board, ai_mark, difficulty):
     if difficulty == "Hard":
-        return best_move_minimax(board, ai_mark)
+        return best_move_hard(board, ai_mark)
     elif difficulty == "Normal":
         return best_move_normal(board, ai_mark)
     else:
@@ -241,11 +439,6 @@ st.markdown('<div class="title-wrap"><span style="font-size:40px">🎮</span><h1
 sub = "👥 Human vs Human" if st.session_state.mode == "Human vs Human" else f"🤖 Human vs AI · <b>{st.session_state.difficulty}</b>"
 st.markdown(f'<div class="smallnote">{sub}</div>', unsafe_allow_html=True)
 
-# Score panel
-sx = f'<span style="color:{X_COLOR}">✘ X</span>: {st.session_state.scores["X"]}'
-so = f'<span style="color:{O_COLOR}">◯ O</span>: {st.session_state.scores["O"]}'
-st.markdown(f'<div class="score-wrap">{sx} &nbsp;&nbsp; {so} &nbsp;&nbsp; 🥇 Tie: {st.session_state.scores["TIE"]}</div>', unsafe_allow_html=True)
-
 # -----------------------------
 # Game mechanics
 # -----------------------------
@@ -254,19 +447,34 @@ def conclude_if_end():
     if winner:
         st.session_state.game_over = True
         st.session_state.scores[winner] += 1
-        st.balloons()
-        st.toast(f"{winner} wins! 🎉", icon="🏆")
+        st.session_state.result = winner
         return True
     if is_board_full(st.session_state.board):
         st.session_state.game_over = True
         st.session_state.scores["TIE"] += 1
-        st.toast("It's a tie. 🤝", icon="💤")
+        st.session_state.result = "TIE"
         return True
     return False
 
+def announce_result():
+    # conclude_if_end runs inside cell callbacks, which can't draw elements
+    # during a fragment rerun; the celebration is shown on the next render.
+    result = st.session_state.pop("result", None)
+    if result == "TIE":
+        st.toast("It's a tie. 🤝", icon="💤")
+    elif result:
+        st.balloons()
+        st.toast(f"{result} wins! 🎉", icon="🏆")
+
 def human_move(cell_index):
     if st.session_state.game_over:
         return
+    # Only allow the correct human to click when vs AI
+    if (
+        st.session_state.mode == "Human vs AI"
+        and st.session_state.current_player != st.session_state.human_mark
+    ):
+        return
     if st.session_state.board[cell_index] == "":
         st.session_state.board[cell_index] = st.session_state.current_player
         # After human dropped, check
@@ -286,47 +494,65 @@ def human_move(cell_index):
                         return
                     st.session_state.current_player = "O" if st.session_state.current_player == "X" else "X"
 
-# Auto-first move by AI when human chooses "O" and board is empty
-if (
-    st.session_state.mode == "Human vs AI"
-    and st.session_state.human_mark == "O"
-    and st.session_state.board == [""] * 9
-    and not st.session_state.game_over
-):
-    ai_mark = "X"
-    ai_idx = get_ai_move(st.session_state.board, ai_mark, st.session_state.difficulty)
-    if ai_idx is not None:
-        st.session_state.board[ai_idx] = ai_mark
-        st.session_state.current_player = "O"
-        # no conclude yet (first move can’t end the game)
+def maybe_ai_move():
+    # Auto-first move by AI when human chooses "O" and board is empty
+    if (
+        st.session_state.mode == "Human vs AI"
+        and st.session_state.human_mark == "O"
+        and st.session_state.board == [""] * 9
+        and not st.session_state.game_over
+    ):
+        ai_mark = "X"
+        ai_idx = get_ai_move(st.session_state.board, ai_mark, st.session_state.difficulty)
+        if ai_idx is not None:
+            st.session_state.board[ai_idx] = ai_mark
+            st.session_state.current_player = "O"
+            # no conclude yet (first move can’t end the game)
 
 # -----------------------------
-# Render 3×3 Grid (clean columns)
+# Game area: score, 3×3 grid, turn
 # -----------------------------
-for r in range(3):
-    cols = st.columns(3, gap="small")
-    for c in range(3):
-        idx = r * 3 + c
-        mark = st.session_state.board[idx]
-        label = display_char(mark)
-
-        # Use form per cell to avoid multiple clicks in same rerun
-        with cols[c].form(key=f"cell-{idx}"):
-            clicked = st.form_submit_button(label if label.strip() else " ", use_container_width=True)
-            if clicked and mark == "":
-                # Only allow the correct human to click when vs AI
-                if st.session_state.mode == "Human vs AI":
-                    if st.session_state.current_player == st.session_state.human_mark:
-                        human_move(idx)
-                else:
-                    human_move(idx)
-
-# Turn indicator
-if not st.session_state.game_over:
-    turn = st.session_state.current_player
-    st.markdown(
-        f'<div class="panel">Turn: {"❌" if turn=="X" else "⭕"} <b>{turn}</b></div>',
-        unsafe_allow_html=True
-    )
-else:
-    st.markdown('<div class="panel">Game Over — start a new round from the sidebar.</div>', unsafe_allow_html=True)
+# A fragment, so a cell click reruns only this block and not the sidebar,
+# header and CSS. The score panel lives here because a move can change it.
+@st.fragment
+def game_area():
+    maybe_ai_move()
+    announce_result()
+
+    sx = f'<span style="color:{X_COLOR}">✘ X</span>: {st.session_state.scores["X"]}'
+    so = f'<span style="color:{O_COLOR}">◯ O</span>: {st.session_state.scores["O"]}'
+    st.markdown(f'<div class="score-wrap">{sx} &nbsp;&nbsp; {so} &nbsp;&nbsp; 🥇 Tie: {st.session_state.scores["TIE"]}</div>', unsafe_allow_html=True)
+
+    if st.session_state.game_over:
+        # Nothing left to click: draw the final board as one markdown block
+        # instead of 9 disabled widgets
+        st.markdown(board_html(st.session_state.board), unsafe_allow_html=True)
+    else:
+        for r in range(3):
+            cols = st.columns(3, gap="small")
+            for c in range(3):
+                idx = r * 3 + c
+                mark = st.session_state.board[idx]
+                label = display_char(mark)
+
+                # Occupied cells are disabled, so a cell can't be taken twice
+                cols[c].button(
+                    label,
+                    key=f"cell-{idx}",
+                    on_click=human_move,
+                    args=(idx,),
+                    use_container_width=True,
+                    disabled=(mark != ""),
+                )
+
+    # Turn indicator
+    if not st.session_state.game_over:
+        turn = st.session_state.current_player
+        st.markdown(
+            f'<div class="panel">Turn: {"❌" if turn=="X" else "⭕"} <b>{turn}</b></div>',
+            unsafe_allow_html=True
+        )
+    else:
+        st.markdown('<div class="panel">Game Over — start a new round from the sidebar.</div>', unsafe_allow_html=True)
+
+game_area()